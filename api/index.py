@@ -1,20 +1,52 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import PyPDF2
+from fastapi.responses import JSONResponse, StreamingResponse
 import os
-import psycopg2 
-from groq import Groq
+from psycopg_pool import ConnectionPool
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from groq import AsyncGroq
 from dotenv import load_dotenv
-import uuid
 import logging
-import json
+import orjson
+import tiktoken
 import re
+import hashlib
+import base64
+import asyncio
+import tempfile
+import signal
+import threading
+import time
+from collections import OrderedDict
+from api.llm_cache import LLMCache
+from api import pdf_text
 
 # --- Setup ---
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# CommonJS requires and Node-only imports, rewritten in a single pass by clean_js_code.
+_RE_SERVER_CODE = re.compile(
+    r"(?P<require>const\s+(?P<name>[^=]+)\s*=\s*require\('(?P<module>[^']+)'\);?)"
+    r"|(?P<import>import\s+[^;\n]+\s+from\s+['\"](?:fs|path|http|module)['\"];)"
+)
+# Substrings every _RE_SERVER_CODE match must contain: "require(" or an opening quote followed by a module
+# name. Only the opening quote is checked because the pattern, like the original, accepts mismatched quotes.
+_SERVER_CODE_MARKERS = ("require(", "'fs", '"fs', "'path", '"path', "'http", '"http', "'module", '"module')
+
+_RE_WHITESPACE = re.compile(r"\s+")
+
+# Loaded in the background (the encoding may be downloaded); used to budget prompt input by tokens rather than characters.
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+_tokenizer_failed_at: float | None = None
+# After a failed load, fall back to character truncation for this long before trying again.
+TOKENIZER_RETRY_SECONDS = 300
+# Leaves room for the prompt scaffolding and completion inside the 8192-token context.
+SUMMARY_INPUT_TOKENS = 3500
+
 app = FastAPI()
 
 app.add_middleware(
@@ -23,52 +55,301 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 if not GROQ_API_KEY:
     logger.error("FATAL: GROQ_API_KEY not found in environment variables.")
-client = Groq(api_key=GROQ_API_KEY)
+client = AsyncGroq(api_key=GROQ_API_KEY)
 
 # --- Vercel Postgres Database Connection ---
 POSTGRES_URL = os.getenv("POSTGRES_URL")
 
-def get_db_connection():
-    """Establishes a connection to the Postgres database and ensures the table exists."""
-    logger.info("Connecting to Postgres database...")
+pool = ConnectionPool(POSTGRES_URL, min_size=2, max_size=10, timeout=10, open=False)
+
+# PDF parsing is CPU-bound and holds the GIL, so it runs in worker processes. Created at startup;
+# where multiprocessing is unavailable it is a single thread, since PDFium is not thread-safe.
+pdf_pool: Executor | None = None
+_pdf_pool_lock = threading.Lock()
+
+MAX_UPLOAD_BYTES = 50_000_000
+UPLOAD_CHUNK_BYTES = 1_048_576
+# Upper bound on files processed at once per /api/summarize request.
+MAX_CONCURRENT_FILES = 8
+
+SCHEMA_SQL = '''CREATE TABLE IF NOT EXISTS summaries
+                 (id TEXT PRIMARY KEY, filename TEXT, summary TEXT, conclusion TEXT, project_ideas TEXT[], content_hash TEXT);
+ALTER TABLE summaries ADD COLUMN IF NOT EXISTS content_hash TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS summaries_content_hash_idx ON summaries (content_hash);
+CREATE INDEX IF NOT EXISTS summaries_filename_idx ON summaries (filename, id)'''
+
+# One-shot migration for tables created when project_ideas was a '|'-joined TEXT column.
+MIGRATION_SQL = '''DO $$
+BEGIN
+    IF (SELECT data_type FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'summaries' AND column_name = 'project_ideas') = 'text' THEN
+        ALTER TABLE summaries ALTER COLUMN project_ideas TYPE TEXT[]
+            USING CASE WHEN project_ideas IS NULL OR project_ideas = '' THEN '{}'::TEXT[] ELSE string_to_array(project_ideas, '|') END;
+    END IF;
+END $$'''
+
+@app.on_event("startup")
+def open_db_pool():
+    """Opens the connection pool and ensures the table exists, once per process."""
+    logger.info("Opening Postgres connection pool...")
+    pool.open()
+    with pool.connection() as conn:
+        conn.execute(SCHEMA_SQL)
+        conn.execute(MIGRATION_SQL)
+    llm_cache.ensure_schema()
+    llm_cache.purge_expired()
+    logger.info("Database pool ready and table ensured.")
+
+def create_pdf_pool() -> Executor:
     try:
-        conn = psycopg2.connect(POSTGRES_URL)
-        with conn.cursor() as cur:
-            cur.execute('''CREATE TABLE IF NOT EXISTS summaries
-                         (id TEXT PRIMARY KEY, filename TEXT, summary TEXT, conclusion TEXT, project_ideas TEXT)''')
-        conn.commit()
-        logger.info("Database connection successful and table ensured.")
-        return conn
-    except Exception as e:
-        logger.error(f"Database connection failed: {e}")
-        raise HTTPException(status_code=500, detail="Could not connect to the database.")
+        # Spawn rather than fork: this process already runs psycopg_pool worker threads.
+        return ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
+    except OSError as e:
+        logger.warning(f"Process pool unavailable, extracting PDFs one at a time in a thread instead: {e}")
+        return ThreadPoolExecutor(max_workers=1)
+
+def replace_broken_pdf_pool(broken: Executor):
+    """Swaps in a fresh pool after a worker died (e.g. a PDFium crash), unless another caller already did."""
+    global pdf_pool
+    with _pdf_pool_lock:
+        if pdf_pool is broken:
+            logger.warning("A PDF worker terminated abruptly; recreating the PDF pool.")
+            broken.shutdown(wait=False)
+            pdf_pool = create_pdf_pool()
+
+@app.on_event("startup")
+def open_pdf_pool():
+    global pdf_pool
+    pdf_pool = create_pdf_pool()
+
+@app.on_event("shutdown")
+def close_db_pool():
+    logger.info("Closing Postgres connection pool...")
+    pool.close()
+
+@app.on_event("shutdown")
+def close_pdf_pool():
+    if pdf_pool:
+        pdf_pool.shutdown()
+
+# --- LLM Response Cache ---
+llm_cache = LLMCache(pool)
+
+# In-process LRU memo for temperature-0 completions, which are deterministic and safe to reuse.
+COMPLETION_MEMO_SIZE = 1024
+_completion_memo: OrderedDict[str, str] = OrderedDict()
+
+def clear_completion_memo():
+    logger.info(f"Clearing {len(_completion_memo)} memoized completions.")
+    _completion_memo.clear()
+
+@app.on_event("startup")
+def install_memo_reset():
+    """Lets operators drop the in-process completion memo with SIGHUP, chaining to any existing handler."""
+    # signal.signal only works on the main thread, which startup handlers don't always run on.
+    if not hasattr(signal, "SIGHUP") or threading.current_thread() is not threading.main_thread():
+        return
+    previous = signal.getsignal(signal.SIGHUP)
+
+    def on_sighup(signum, frame):
+        clear_completion_memo()
+        if callable(previous):
+            previous(signum, frame)
+
+    signal.signal(signal.SIGHUP, on_sighup)
+
+def completion_cache_key(cache_params: dict | None, params: dict) -> str:
+    return LLMCache.make_key(cache_params or {k: params.get(k) for k in ("model", "messages", "temperature", "max_tokens", "response_format")})
+
+async def cached_completion(cache_params: dict | None = None, parse=None, **params):
+    """Calls Groq through the LLM cache and returns the message content, or `parse(content)` when given.
+
+    The cache key is built from `cache_params` when given, otherwise from the request parameters themselves.
+    Output is only cached once `parse` has accepted it and the model finished normally, so a malformed or
+    truncated completion is never replayed to later requests.
+    """
+    key = completion_cache_key(cache_params, params)
+    deterministic = params.get("temperature") == 0
+    if deterministic and key in _completion_memo:
+        _completion_memo.move_to_end(key)
+        content = _completion_memo[key]
+        return parse(content) if parse else content
+    cached = await asyncio.to_thread(llm_cache.get, key)
+    if cached is not None:
+        content = cached["content"]
+        result = parse(content) if parse else content
+    else:
+        response = await client.chat.completions.create(**params)
+        choice = response.choices[0]
+        content = choice.message.content
+        result = parse(content) if parse else content
+        if choice.finish_reason != "stop":
+            logger.warning(f"Not caching completion that ended with finish_reason={choice.finish_reason!r}.")
+            return result
+        await asyncio.to_thread(llm_cache.set, key, {"content": content})
+    if deterministic:
+        _completion_memo[key] = content
+        if len(_completion_memo) > COMPLETION_MEMO_SIZE:
+            _completion_memo.popitem(last=False)
+    return result
+
+async def open_completion_stream(parse=None, **params):
+    """Starts a streamed Groq completion and returns an async iterator over its text.
+
+    The upstream request is made here, before any response has been sent, so errors can still become an
+    HTTP error status. The full text is cached only if the stream finishes with finish_reason == "stop"
+    and `parse` (when given) accepts it.
+    """
+    key = completion_cache_key(None, params)
+    cached = await asyncio.to_thread(llm_cache.get, key)
+    if cached is not None:
+        async def replay():
+            yield cached["content"]
+        return replay()
+    stream = await client.chat.completions.create(**params, stream=True)
+
+    async def relay():
+        parts = []
+        finish_reason = None
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                finish_reason = choice.finish_reason or finish_reason
+                delta = choice.delta.content or ""
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            logger.error(f"Groq stream failed mid-response: {e}")
+            raise
+        finally:
+            await stream.close()
+        if finish_reason != "stop":
+            logger.warning(f"Not caching streamed completion that ended with finish_reason={finish_reason!r}.")
+            return
+        content = "".join(parts)
+        if parse:
+            try:
+                parse(content)
+            except Exception as e:
+                logger.warning(f"Not caching streamed completion that failed to parse: {e}")
+                return
+        await asyncio.to_thread(llm_cache.set, key, {"content": content})
+
+    return relay()
+
+# --- Core Helper Functions ---
+async def spool_upload(file: UploadFile) -> tuple[str, str]:
+    """Streams an upload to a temporary file, enforcing MAX_UPLOAD_BYTES, and returns (path, sha256 hex digest).
+
+    Only one chunk is held in memory at a time and the PDF worker opens the file by path, so memory stays
+    flat regardless of PDF size. Disk writes run in a thread. The caller must remove the file.
+    """
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"{file.filename} exceeds the {MAX_UPLOAD_BYTES} byte upload limit.")
+    spill = await asyncio.to_thread(tempfile.NamedTemporaryFile, suffix=".pdf", delete=False)
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail=f"{file.filename} exceeds the {MAX_UPLOAD_BYTES} byte upload limit.")
+            digest.update(chunk)
+            await asyncio.to_thread(spill.write, chunk)
+        await asyncio.to_thread(spill.close)
+    except BaseException:
+        spill.close()
+        os.unlink(spill.name)
+        raise
+    finally:
+        await file.close()
+    return spill.name, digest.hexdigest()
+
+async def run_pdf_extraction(source: str) -> str:
+    executor = pdf_pool
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, pdf_text.extract_text, source)
+    except BrokenProcessPool:
+        replace_broken_pdf_pool(executor)
+        raise
 
-# --- Core Helper Functions (Unchanged) ---
-def extract_text_from_pdf(file_obj):
+async def extract_text_from_pdf(source: str):
     logger.info("Extracting text from PDF...")
     try:
-        reader = PyPDF2.PdfReader(file_obj)
-        text = "".join(page.extract_text() or "" for page in reader.pages)
-        if not text.strip():
-            raise ValueError("No text could be extracted from the PDF.")
+        try:
+            text = await run_pdf_extraction(source)
+        except BrokenProcessPool:
+            # Retry once on a fresh pool; a second crash is most likely caused by this PDF.
+            text = await run_pdf_extraction(source)
         logger.info(f"Extracted {len(text)} characters from PDF.")
         return text
+    except BrokenProcessPool as e:
+        logger.error(f"PDF extraction worker crashed twice: {e}")
+        raise HTTPException(status_code=500, detail="PDF extraction worker crashed while processing this file.")
     except Exception as e:
         logger.error(f"Error during PDF text extraction: {e}")
         raise HTTPException(status_code=400, detail=f"Failed to extract text from PDF: {e}")
 
-def generate_summary_and_conclusion(text: str):
+def get_tokenizer():
+    """Returns the cl100k_base encoding, or None if it isn't available (yet).
+
+    Loading may download the encoding, so this blocks and must not run on the event loop. Only one thread
+    attempts the load at a time, and a failure is remembered for TOKENIZER_RETRY_SECONDS.
+    """
+    global _tokenizer, _tokenizer_failed_at
+    if _tokenizer is not None:
+        return _tokenizer
+    if _tokenizer_failed_at is not None and time.monotonic() - _tokenizer_failed_at < TOKENIZER_RETRY_SECONDS:
+        return None
+    if not _tokenizer_lock.acquire(blocking=False):
+        return None
+    try:
+        if _tokenizer is None:
+            _tokenizer = tiktoken.get_encoding("cl100k_base")
+            _tokenizer_failed_at = None
+    except Exception as e:
+        _tokenizer_failed_at = time.monotonic()
+        logger.warning(f"Could not load tiktoken encoding, truncating by characters instead: {e}")
+    finally:
+        _tokenizer_lock.release()
+    return _tokenizer
+
+@app.on_event("startup")
+async def warm_tokenizer():
+    """Loads the encoding in the background so neither startup nor the first request waits on the download."""
+    app.state.tokenizer_warmup = asyncio.create_task(asyncio.to_thread(get_tokenizer))
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Collapses whitespace and trims `text` to at most `max_tokens` tokens. Blocking; run it in a thread."""
+    # Tokens average ~4 characters, so 8 per token leaves ample headroom while bounding the work on huge PDFs.
+    text = _RE_WHITESPACE.sub(" ", text[:max_tokens * 8]).strip()
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        # Roughly 4 characters per token for English text.
+        return text[:max_tokens * 4]
+    ids = tokenizer.encode(text, disallowed_special=())
+    if len(ids) <= max_tokens:
+        return text
+    return tokenizer.decode(ids[:max_tokens])
+
+async def generate_summary_and_conclusion(text: str, deterministic: bool = False):
     logger.info("Generating summary and conclusion...")
-    prompt = f"Summarize the following research paper text (max 200 words) and provide a separate conclusion. Separate the summary and conclusion with the exact phrase 'Conclusion:'.\n\nText: {text[:4000]}"
+    text = await asyncio.to_thread(truncate_to_tokens, text, SUMMARY_INPUT_TOKENS)
+    temperature = 0 if deterministic else 0.7
+    prompt = f"Summarize the following research paper text (max 200 words) and provide a separate conclusion. Separate the summary and conclusion with the exact phrase 'Conclusion:'.\n\nText: {text}"
     try:
-        response = client.chat.completions.create(model="llama3-70b-8192", messages=[{"role": "user", "content": prompt}], max_tokens=500, temperature=0.7)
-        output = response.choices[0].message.content
+        # Keyed on the normalized PDF text itself so re-uploads of the same paper skip the API call.
+        cache_params = {"task": "summary", "model": "llama3-70b-8192", "text_sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(), "temperature": temperature, "max_tokens": 500}
+        output = await cached_completion(cache_params, model="llama3-70b-8192", messages=[{"role": "user", "content": prompt}], max_tokens=500, temperature=temperature)
         parts = output.split("Conclusion:", 1)
         summary = parts[0].strip()
         conclusion = parts[1].strip() if len(parts) > 1 else "No specific conclusion was generated."
@@ -77,25 +358,38 @@ def generate_summary_and_conclusion(text: str):
         logger.error(f"Groq API error during summary generation: {e}")
         raise HTTPException(status_code=500, detail="Error communicating with AI for summary generation.")
 
-def generate_project_ideas(summary: str):
+async def generate_project_ideas(summary: str, deterministic: bool = False):
     logger.info("Generating project ideas...")
+    temperature = 0 if deterministic else 0.8
     prompt = f"Based on the following research summary, list 3-5 innovative and feasible website project ideas. Each idea should be on a new line and described in a single, concise sentence.\n\nSummary:\n{summary}"
     try:
-        response = client.chat.completions.create(model="llama3-70b-8192", messages=[{"role": "user", "content": prompt}], max_tokens=300, temperature=0.8)
-        raw_ideas = response.choices[0].message.content.strip()
+        raw_ideas = (await cached_completion(model="llama3-70b-8192", messages=[{"role": "user", "content": prompt}], max_tokens=300, temperature=temperature)).strip()
         return [idea.strip() for idea in raw_ideas.split("\n") if idea.strip()]
     except Exception as e:
         logger.error(f"Groq API error during project idea generation: {e}")
         raise HTTPException(status_code=500, detail="Error communicating with AI for project ideas.")
 
+def _replace_server_code(match: re.Match) -> str:
+    if match.group("require"):
+        return f'// const {match.group("name")} = require("{match.group("module")}"); // Commented out for browser compatibility'
+    return '// Server-side import removed for browser'
+
 def clean_js_code(code: str):
-    code = re.sub(r'const\s+([^=]+)\s*=\s*require\(\'([^\']+)\'\);?', r'// const \1 = require("\2"); // Commented out for browser compatibility', code)
-    code = re.sub(r'import\s+[^;\n]+\s+from\s+[\'"](fs|path|http|module)[\'"];', '// Server-side import removed for browser', code)
-    return code
+    # Most generated scripts contain neither pattern; skip the regex scan entirely for those.
+    if not any(marker in code for marker in _SERVER_CODE_MARKERS):
+        return code
+    return _RE_SERVER_CODE.sub(_replace_server_code, code)
 
-def generate_website_code(project_idea: str):
-    logger.info(f"Generating in-depth website code for: {project_idea}")
-    prompt = f"""
+def parse_website_code(content: str) -> dict:
+    """Parses a website-code completion; raises if it is not JSON or lacks frontend.script_js."""
+    data = orjson.loads(content)
+    data["frontend"]["script_js"] = clean_js_code(data["frontend"]["script_js"])
+    return data
+
+WEBSITE_COMPLETION_PARAMS = {"model": "llama3-70b-8192", "max_tokens": 4096, "temperature": 0.5, "response_format": {"type": "json_object"}}
+
+def website_prompt(project_idea: str):
+    return f"""
 Generate a complete, functional, and well-commented web application based on the following idea.
 **Project Idea:** {project_idea}
 **Requirements:**
@@ -104,92 +398,188 @@ Generate a complete, functional, and well-commented web application based on the
 3.  **Instructions:** A clear Markdown string explaining the project.
 **Output Format:** A single, valid JSON object with keys: "frontend" (an object with "index_html", "styles_css", "script_js"), "backend", "instructions".
 """
+
+async def generate_website_code(project_idea: str):
+    logger.info(f"Generating in-depth website code for: {project_idea}")
+    prompt = website_prompt(project_idea)
     try:
-        response = client.chat.completions.create(model="llama3-70b-8192", messages=[{"role": "user", "content": prompt}], max_tokens=4096, temperature=0.5, response_format={"type": "json_object"})
-        content = response.choices[0].message.content
-        data = json.loads(content)
-        data["frontend"]["script_js"] = clean_js_code(data["frontend"]["script_js"])
-        return data
+        return await cached_completion(parse=parse_website_code, messages=[{"role": "user", "content": prompt}], **WEBSITE_COMPLETION_PARAMS)
     except Exception as e:
         logger.error(f"Error generating website code: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate website code from AI.")
 
-def edit_website_code(original_code: dict, edit_request: str):
-    logger.info(f"Editing website code with request: {edit_request}")
-    prompt = f"""
+def edit_prompt(original_code: dict, edit_request: str):
+    return f"""
 Given this website's source code and an edit request, modify the code to implement the change. Return the complete, updated code in the same JSON format.
-**Original Code:** {json.dumps(original_code)}
+**Original Code:** {orjson.dumps(original_code).decode()}
 **Edit Request:** {edit_request}
 """
+
+async def edit_website_code(original_code: dict, edit_request: str):
+    logger.info(f"Editing website code with request: {edit_request}")
+    prompt = edit_prompt(original_code, edit_request)
     try:
-        response = client.chat.completions.create(model="llama3-70b-8192", messages=[{"role": "user", "content": prompt}], max_tokens=4096, temperature=0.5, response_format={"type": "json_object"})
-        content = response.choices[0].message.content
-        data = json.loads(content)
-        data["frontend"]["script_js"] = clean_js_code(data["frontend"]["script_js"])
-        return data
+        return await cached_completion(parse=parse_website_code, messages=[{"role": "user", "content": prompt}], **WEBSITE_COMPLETION_PARAMS)
     except Exception as e:
         logger.error(f"Error editing website code: {e}")
         raise HTTPException(status_code=500, detail="Failed to edit website code with AI.")
 
 
+def find_summary(content_hash: str):
+    """Returns the stored summary for a PDF with this content hash, or None."""
+    with pool.connection() as conn:
+        row = conn.execute(
+            "SELECT summary, conclusion, project_ideas FROM summaries WHERE content_hash = %s", (content_hash,)
+        ).fetchone()
+    if row is None:
+        return None
+    return {"summary": row[0], "conclusion": row[1], "project_ideas": row[2] or []}
+
+def insert_summaries(rows: list[tuple]):
+    """Inserts (id, content_hash, filename, summary, conclusion, project_ideas) rows in one pipelined batch."""
+    with pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.executemany(
+                "INSERT INTO summaries (id, content_hash, filename, summary, conclusion, project_ideas) VALUES (%s, %s, %s, %s, %s, %s) ON CONFLICT (content_hash) DO NOTHING",
+                rows
+            )
+
+
 # --- API Endpoints (Updated for Postgres) ---
 @app.post("/api/summarize")
-async def summarize_papers(files: list[UploadFile] = File(...)):
-    results = []
-    conn = None
+async def summarize_papers(files: list[UploadFile] = File(...), deterministic: bool = False):
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_FILES)
+
+    # One analysis per distinct PDF: later copies in the same request share the first copy's task.
+    analyses: dict[str, asyncio.Task] = {}
+
+    async def analyze(source: str, content_hash: str):
+        """Returns (analysis, is_new); PDFs already in the table skip extraction and Groq."""
+        stored = await asyncio.to_thread(find_summary, content_hash)
+        if stored is not None:
+            logger.info(f"Reusing stored summary for {content_hash[:12]}.")
+            return stored, False
+        text = await extract_text_from_pdf(source)
+        summary, conclusion = await generate_summary_and_conclusion(text, deterministic)
+        project_ideas = await generate_project_ideas(summary, deterministic)
+        return {"summary": summary, "conclusion": conclusion, "project_ideas": project_ideas}, True
+
+    async def process(file: UploadFile):
+        """Returns (result, content_hash, is_new); is_new is True only for the copy that should be inserted."""
+        async with semaphore:
+            source, content_hash = await spool_upload(file)
+            if content_hash in analyses:
+                os.unlink(source)
+                analysis, _ = await analyses[content_hash]
+                return {"filename": file.filename, **analysis}, content_hash, False
+            try:
+                analyses[content_hash] = tg.create_task(analyze(source, content_hash))
+                analysis, is_new = await analyses[content_hash]
+            finally:
+                os.unlink(source)
+        return {"filename": file.filename, **analysis}, content_hash, is_new
+
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            for file in files:
-                text = extract_text_from_pdf(file.file)
-                summary, conclusion = generate_summary_and_conclusion(text)
-                project_ideas = generate_project_ideas(summary)
-                
-                cur.execute(
-                    "INSERT INTO summaries (id, filename, summary, conclusion, project_ideas) VALUES (%s, %s, %s, %s, %s)",
-                    (str(uuid.uuid4()), file.filename, summary, conclusion, "|".join(project_ideas))
-                )
-                results.append({"filename": file.filename, "summary": summary, "conclusion": conclusion, "project_ideas": project_ideas})
-        conn.commit()
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(process(file)) for file in files]
+        except ExceptionGroup as eg:
+            # The TaskGroup has already cancelled the remaining files; surface the first failure as-is.
+            raise eg.exceptions[0]
+        processed = [task.result() for task in tasks]
+        results = [result for result, _, _ in processed]
+        rows = [(content_hash, content_hash, r["filename"], r["summary"], r["conclusion"], r["project_ideas"]) for r, content_hash, is_new in processed if is_new]
+        if rows:
+            await asyncio.to_thread(insert_summaries, rows)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in /api/summarize endpoint: {e}")
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
-    finally:
-        if conn:
-            conn.close()
     return JSONResponse(content=results)
 
+def encode_summaries_cursor(filename: str, summary_id: str) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps([filename, summary_id])).decode()
+
+def decode_summaries_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        filename, summary_id = orjson.loads(base64.urlsafe_b64decode(cursor))
+        if not isinstance(filename, str) or not isinstance(summary_id, str):
+            raise ValueError("cursor fields must be strings")
+    except Exception:
+        raise HTTPException(status_code=400, detail="Malformed 'cursor'.")
+    return filename, summary_id
+
 @app.get("/api/summaries")
-async def get_summaries():
-    conn = None
+def get_summaries(limit: int = Query(50, ge=1, le=200), cursor: str | None = None):
+    """Returns one page of summaries ordered by filename.
+
+    When more rows may follow, the `X-Next-Cursor` header holds the value to pass as `cursor` for the next page.
+    The cursor carries the last row's (filename, id), so every page is a single indexed query.
+    Plain `def` so FastAPI runs the blocking database calls in its threadpool.
+    """
+    after = decode_summaries_cursor(cursor) if cursor is not None else None
     try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            cur.execute("SELECT id, filename, summary, conclusion, project_ideas FROM summaries ORDER BY filename")
-            rows = cur.fetchall()
-        summaries = [{"filename": r[1], "summary": r[2], "conclusion": r[3], "project_ideas": r[4].split("|") if r[4] else []} for r in rows]
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                if after is None:
+                    cur.execute("SELECT id, filename, summary, conclusion, project_ideas FROM summaries ORDER BY filename, id LIMIT %s", (limit,))
+                else:
+                    cur.execute(
+                        """SELECT id, filename, summary, conclusion, project_ideas FROM summaries
+                           WHERE (filename, id) > (%s, %s)
+                           ORDER BY filename, id LIMIT %s""",
+                        (*after, limit)
+                    )
+                rows = cur.fetchall()
+        summaries = [{"filename": r[1], "summary": r[2], "conclusion": r[3], "project_ideas": r[4] or []} for r in rows]
     except Exception as e:
         logger.error(f"Error in /api/summaries endpoint: {e}")
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
-    finally:
-        if conn:
-            conn.close()
-    return JSONResponse(content=summaries)
+    headers = {"X-Next-Cursor": encode_summaries_cursor(rows[-1][1], rows[-1][0])} if len(rows) == limit else None
+    return JSONResponse(content=summaries, headers=headers)
 
 @app.post("/api/generate-website")
-async def generate_website_code_api(data: dict):
+async def generate_website_code_api(data: dict, stream: bool = False):
+    """Generates website code for a project idea.
+
+    By default the response is the parsed code with clean_js_code applied to `frontend.script_js`, plus the
+    request's `project_idea`. With `?stream=true` the body is instead the raw model JSON streamed as it is
+    generated, and its shape differs: there is no `project_idea` key (the client already sent it), and
+    `script_js` is not cleaned, so Node-only `require(...)`/server imports are left in for the client to handle.
+    """
     project_idea = data.get("idea")
     if not project_idea:
         raise HTTPException(status_code=400, detail="Request body must include a project 'idea'.")
-    result = generate_website_code(project_idea)
+    if stream:
+        logger.info(f"Streaming website code for: {project_idea}")
+        messages = [{"role": "user", "content": website_prompt(project_idea)}]
+        try:
+            chunks = await open_completion_stream(parse=parse_website_code, messages=messages, **WEBSITE_COMPLETION_PARAMS)
+        except Exception as e:
+            logger.error(f"Error streaming website code: {e}")
+            raise HTTPException(status_code=500, detail="Failed to generate website code from AI.")
+        return StreamingResponse(chunks, media_type="application/json")
+    result = await generate_website_code(project_idea)
     result["project_idea"] = project_idea
     return JSONResponse(content=result)
 
 @app.post("/api/edit-code")
-async def edit_code_api(data: dict):
+async def edit_code_api(data: dict, stream: bool = False):
+    """Applies an edit request to website code. `?stream=true` streams the raw model JSON, with the same
+    caveat as /api/generate-website: `script_js` is not passed through clean_js_code."""
     original_code = data.get("original_code")
     edit_request = data.get("edit_request")
     if not original_code or not edit_request:
         raise HTTPException(status_code=400, detail="Request body must include 'original_code' and 'edit_request'.")
-    result = edit_website_code(original_code, edit_request)
+    if stream:
+        logger.info(f"Streaming website code edit: {edit_request}")
+        messages = [{"role": "user", "content": edit_prompt(original_code, edit_request)}]
+        try:
+            chunks = await open_completion_stream(parse=parse_website_code, messages=messages, **WEBSITE_COMPLETION_PARAMS)
+        except Exception as e:
+            logger.error(f"Error streaming website code edit: {e}")
+            raise HTTPException(status_code=500, detail="Failed to edit website code with AI.")
+        return StreamingResponse(chunks, media_type="application/json")
+    result = await edit_website_code(original_code, edit_request)
     return JSONResponse(content=result)
\ No newline at end of file
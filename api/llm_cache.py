@@ -0,0 +1,62 @@
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from psycopg.types.json import Jsonb
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_SQL = '''CREATE TABLE IF NOT EXISTS llm_cache
+                 (key TEXT PRIMARY KEY, response JSONB NOT NULL, created_at TIMESTAMPTZ NOT NULL DEFAULT now(), expires_at TIMESTAMPTZ NOT NULL);
+CREATE INDEX IF NOT EXISTS llm_cache_key_expires_idx ON llm_cache (key, expires_at)'''
+
+
+class LLMCache:
+    """Postgres-backed exact-match cache for LLM completions."""
+
+    def __init__(self, pool, ttl: timedelta = timedelta(days=7)):
+        self.pool = pool
+        self.ttl = ttl
+
+    def ensure_schema(self):
+        with self.pool.connection() as conn:
+            conn.execute(SCHEMA_SQL)
+
+    def purge_expired(self):
+        """Deletes expired entries; reads already ignore them, but they would otherwise accumulate forever."""
+        with self.pool.connection() as conn:
+            deleted = conn.execute("DELETE FROM llm_cache WHERE expires_at < now()").rowcount
+        logger.info(f"Purged {deleted} expired LLM cache entries.")
+
+    @staticmethod
+    def make_key(params: dict) -> str:
+        """Builds a stable cache key from the request parameters (model, messages, temperature, ...)."""
+        payload = json.dumps(params, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """Returns the cached response for `key`, or None on a miss. Cache failures are treated as misses."""
+        try:
+            with self.pool.connection() as conn:
+                row = conn.execute(
+                    "SELECT response FROM llm_cache WHERE key = %s AND expires_at > now()", (key,)
+                ).fetchone()
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            return None
+        if row is None:
+            return None
+        logger.info(f"LLM cache hit for key {key[:12]}.")
+        return row[0]
+
+    def set(self, key: str, response: dict):
+        try:
+            with self.pool.connection() as conn:
+                conn.execute(
+                    """INSERT INTO llm_cache (key, response, created_at, expires_at) VALUES (%s, %s, now(), now() + %s)
+                       ON CONFLICT (key) DO UPDATE SET response = EXCLUDED.response, created_at = EXCLUDED.created_at, expires_at = EXCLUDED.expires_at""",
+                    (key, Jsonb(response), self.ttl)
+                )
+        except Exception as e:
+            logger.warning(f"LLM cache store failed: {e}")
@@ -0,0 +1,14 @@
+# Kept free of app imports: spawned PDF workers import only this module, not api.index.
+import pypdfium2 as pdfium
+
+
+def extract_text(source: bytes | str) -> str:
+    """Extracts all page text from PDF bytes or a file path. Runs inside the PDF worker pool."""
+    pdf = pdfium.PdfDocument(source)
+    try:
+        text = "".join(pdf[i].get_textpage().get_text_range() for i in range(len(pdf)))
+    finally:
+        pdf.close()
+    if not text.strip():
+        raise ValueError("No text could be extracted from the PDF.")
+    return text